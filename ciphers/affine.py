@@ -1,4 +1,35 @@
-from helper import euclidean_algorithm_extended as eae
+import functools
+from math import gcd
+
+from helper import BYTE_ENCODING, encode_in_alphabet
+
+
+@functools.lru_cache(maxsize=4096)
+def _affine_table(letters, a, b):
+    """
+    Affine substitution x -> (a * x + b) mod m over the alphabet, as a str.translate table.
+    :param letters: Alphabet as a string
+    :param a: Multiplicative key 'a'
+    :param b: Additive key 'b'
+    :return: Translation table for str.translate
+    """
+
+    m = len(letters)
+    return str.maketrans({ch: letters[(a * x + b) % m] for x, ch in enumerate(letters)})
+
+
+@functools.lru_cache(maxsize=4096)
+def _affine_bytes_table(letter_bytes, a, b):
+    """
+    Affine substitution x -> (a * x + b) mod m over the encoded alphabet, as a bytes.translate table.
+    :param letter_bytes: Alphabet encoded into BYTE_ENCODING
+    :param a: Multiplicative key 'a'
+    :param b: Additive key 'b'
+    :return: 256-byte translation table for bytes.translate
+    """
+
+    m = len(letter_bytes)
+    return bytes.maketrans(letter_bytes, bytes(letter_bytes[(a * x + b) % m] for x in range(m)))
 
 
 def encrypt(_alphabet, _text, a, b):
@@ -13,11 +44,12 @@ def encrypt(_alphabet, _text, a, b):
     """
 
     m = len(_alphabet)
-    if eae(a, m)[0] != 1:
+    if gcd(a, m) != 1:
         raise ValueError(f"'a'={a} must be coprime with the alphabet length m={m}")
-    result = ''
-    for ch in _text:
-        x = _alphabet.index(ch)
-        y = (a * x + b) % m
-        result += _alphabet[y]
-    return result
+
+    letters = ''.join(_alphabet)
+    data, letter_bytes = encode_in_alphabet(_text, letters)
+    if data is not None:
+        return data.translate(_affine_bytes_table(letter_bytes, a, b)).decode(BYTE_ENCODING)
+
+    return _text.translate(_affine_table(letters, a, b))
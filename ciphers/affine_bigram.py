@@ -1,4 +1,54 @@
-from helper import euclidean_algorithm_extended as eae
+import functools
+from math import gcd
+
+from helper import encode_in_alphabet
+
+
+@functools.lru_cache(maxsize=64)
+def _index_map(letters):
+    """
+    Index of every character in the alphabet.
+    :param letters: Alphabet as a string
+    :return: dict[str, int]
+    """
+
+    return {ch: i for i, ch in enumerate(letters)}
+
+
+@functools.lru_cache(maxsize=64)
+def _index_bytes_table(letter_bytes):
+    """
+    Encoded letter -> its index in the alphabet, as a bytes.translate table.
+    :param letter_bytes: Alphabet encoded into helper.BYTE_ENCODING
+    :return: 256-byte translation table for bytes.translate
+    """
+
+    return bytes.maketrans(letter_bytes, bytes(range(len(letter_bytes))))
+
+
+@functools.lru_cache(maxsize=64)
+def _pair_strings(letters):
+    """
+    Bigram of every code Y: letters[(Y // m) % m] + letters[Y % m] for Y in [0, 3*m^2),
+    so that unreduced sums of the key terms can be used as indices directly.
+    :param letters: Alphabet as a string
+    :return: list[str] of length 3*m^2
+    """
+
+    return [y1 + y2 for y1 in letters for y2 in letters] * 3
+
+
+@functools.lru_cache(maxsize=1024)
+def _key_terms(m, a):
+    """
+    Products of the key 'a' with each letter index, reduced modulo m^2, for both bigram positions.
+    :param m: Alphabet size
+    :param a: Multiplicative key 'a'
+    :return: Tuple (high, low) of lists: high[x1] = a*x1*m mod m^2, low[x2] = a*x2 mod m^2
+    """
+
+    nmod = m * m
+    return [a * x * m % nmod for x in range(m)], [a * x % nmod for x in range(m)]
 
 
 def encrypt(_alphabet, _text, a, b, crossing=False, pad_char=None):
@@ -23,10 +73,11 @@ def encrypt(_alphabet, _text, a, b, crossing=False, pad_char=None):
     m = len(_alphabet)
     nmod = m * m
 
-    if eae(a, nmod)[0] != 1:
+    if gcd(a, nmod) != 1:
         raise ValueError(f"'a'={a} must be coprime with m^2={nmod}")
 
-    idx = {ch: i for i, ch in enumerate(_alphabet)}
+    letters = ''.join(_alphabet)
+    idx = _index_map(letters)
 
     if not crossing:
         if len(_text) % 2 == 1:
@@ -34,24 +85,21 @@ def encrypt(_alphabet, _text, a, b, crossing=False, pad_char=None):
             if pad_char not in idx:
                 raise ValueError("pad_char must be a character from _alphabet")
             _text = _text + pad_char
+    elif len(_text) < 2:
+        return ""
 
-        it = ((i, i + 1) for i in range(0, len(_text), 2))
+    data, letter_bytes = encode_in_alphabet(_text, letters)
+    if data is not None:
+        xs = data.translate(_index_bytes_table(letter_bytes))
     else:
-        if len(_text) < 2:
-            return ""
-        it = ((i, i + 1) for i in range(0, len(_text) - 1))
-
-    res = []
-    for i, j in it:
-        c1, c2 = _text[i], _text[j]
-        try:
-            x1, x2 = idx[c1], idx[c2]
-        except KeyError as e:
-            raise ValueError(f"Character {e.args[0]!r} not in alphabet") from None
-
-        X = x1 * m + x2
-        Y = (a * X + b) % nmod
-        y1, y2 = divmod(Y, m)
-        res.append(_alphabet[y1] + _alphabet[y2])
-
-    return "".join(res)
+        xs = [idx[ch] for ch in _text]
+
+    pairs = zip(xs, xs[1:]) if crossing else zip(xs[0::2], xs[1::2])
+    bigrams = _pair_strings(letters)
+
+    # Y = (a*x1*m + a*x2 + b) mod m^2: each of the three terms is reduced in advance, so their
+    # sum is below 3*m^2 and indexes the tripled bigram list without a modulo per bigram.
+    high, low = _key_terms(m, a)
+    b %= nmod
+
+    return "".join([bigrams[high[x1] + low[x2] + b] for x1, x2 in pairs])
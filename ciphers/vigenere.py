@@ -1,3 +1,33 @@
+import functools
+
+from helper import BYTE_ENCODING, encode_in_alphabet
+
+
+@functools.lru_cache(maxsize=1024)
+def _shift_table(letters, shift):
+    """
+    Caesar shift x -> (x + shift) mod m over the alphabet, as a str.translate table.
+    :param letters: Alphabet as a string
+    :param shift: Key index in the alphabet
+    :return: Translation table for str.translate
+    """
+
+    m = len(letters)
+    return str.maketrans({ch: letters[(x + shift) % m] for x, ch in enumerate(letters)})
+
+
+@functools.lru_cache(maxsize=1024)
+def _shift_bytes_table(letter_bytes, shift):
+    """
+    Caesar shift x -> (x + shift) mod m over the encoded alphabet, as a bytes.translate table.
+    :param letter_bytes: Alphabet encoded into BYTE_ENCODING
+    :param shift: Key index in the alphabet
+    :return: 256-byte translation table for bytes.translate
+    """
+
+    return bytes.maketrans(letter_bytes, letter_bytes[shift:] + letter_bytes[:shift])
+
+
 def encrypt(_alphabet, _text, _key):
     """
     The encrypt function takes in a string of characters, and returns an encrypted version of that string.
@@ -9,11 +39,54 @@ def encrypt(_alphabet, _text, _key):
     :return: A string that is the encrypted text
     """
 
-    result = ''
-    for i in range(len(_text)):
-        symbol_index = _alphabet.index(_text[i])
-        key_index = _alphabet.index(_key[i % len(_key)])
-        value = (symbol_index + key_index) % len(_alphabet)
-        result += _alphabet[value]
+    if _text and not _key:
+        raise ValueError("_key must contain at least one character")
+
+    idx = {ch: i for i, ch in enumerate(_alphabet)}
+    try:
+        key_indices = [idx[ch] for ch in _key]
+    except KeyError as e:
+        raise ValueError(f"Character {e.args[0]!r} not in alphabet") from None
+
+    return encrypt_shifts(_alphabet, _text, key_indices)
+
+
+def encrypt_shifts(_alphabet, _text, key_indices):
+    """
+    Vigenere encryption with the key given directly as alphabet indices (Caesar shifts),
+    so callers that draw random keys do not have to build and re-parse a key string.
+    :param _alphabet: Alphabet (string or list of characters)
+    :param _text: Plaintext to encrypt (characters must be in _alphabet)
+    :param key_indices: Sequence of shifts, each an integer in [0, m-1]
+    :return: Encrypted text (ciphertext)
+    """
+
+    if _text and not key_indices:
+        raise ValueError("key_indices must contain at least one shift")
+
+    letters = ''.join(_alphabet)
+    data, letter_bytes = encode_in_alphabet(_text, letters)
+    key_len = len(key_indices)
+
+    # All positions with the same i % key_len get the same Caesar shift, so each such
+    # stride is translated in one call and written back into its slots. When the alphabet
+    # has a single-byte encoding this is done on bytes with flat 256-entry tables.
+    if data is not None:
+        tables = [_shift_bytes_table(letter_bytes, shift) for shift in key_indices]
+        if key_len == 1:
+            return data.translate(tables[0]).decode(BYTE_ENCODING)
+
+        out = bytearray(len(data))
+        for j, table in enumerate(tables):
+            out[j::key_len] = data[j::key_len].translate(table)
+        return out.decode(BYTE_ENCODING)
+
+    tables = [_shift_table(letters, shift) for shift in key_indices]
+    if key_len == 1:
+        return _text.translate(tables[0])
+
+    result = [''] * len(_text)
+    for j, table in enumerate(tables):
+        result[j::key_len] = _text[j::key_len].translate(table)
 
-    return result
+    return ''.join(result)
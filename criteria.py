@@ -1,9 +1,109 @@
-import bz2
-import lzma
-import zlib
+import functools
+import operator
+import re
 import helper as h
 
 
+def _compress_ratio(s, compressor="lzma", level=None):
+    """
+    Compression ratio r(X) = compressed_size(X) / original_size(X) of a sequence, in bytes.
+    :param s: str — analyzed sequence.
+    :param compressor: str — one of {"lzma", "deflate", "bzip2"}.
+    :param level: int | None — compression level/preset, None for the backend default.
+    :return: float — r(X); 1.0 for an empty sequence.
+    """
+
+    return h.compression_ratio(s.encode("utf-8", errors="ignore"), compressor, level)
+
+
+def _as_set(grams):
+    """
+    Normalizes a forbidden l-gram collection for O(1) membership tests.
+    :param grams: Iterable[str] | None
+    :return: frozenset[str] | None (None is passed through, so callers can keep their `is None` checks).
+    """
+
+    return None if grams is None else frozenset(grams)
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_pattern(grams, overlapping=False):
+    """
+    Compiles a set of l-grams into one regular expression that matches any of them.
+    Grams are grouped by their prefix so that the last symbol becomes a character class
+    (e.g. {'аб', 'ав', 'гд'} -> 'а[бв]|г[д]'); this keeps the number of alternatives at most
+    |alphabet| and lets the regex engine scan the text in a single C-level pass.
+    Compiled patterns are cached, so repeated criteria calls over the same A_prh reuse them.
+    :param grams: frozenset[str] of non-empty l-grams (hashable cache key, see _as_set).
+    :param overlapping: If True, wrap the alternation in a capturing lookahead so that findall() returns
+        the l-gram found at every start position, i.e. overlapping occurrences as the sliding-window loops see them.
+    :return: re.Pattern — never matches if `grams` is empty.
+    """
+
+    by_prefix = {}
+    for gram in sorted(grams):
+        by_prefix.setdefault(gram[:-1], []).append(gram[-1])
+    if not by_prefix:
+        return re.compile(r'(?!)')
+
+    alternation = '|'.join(
+        f"{re.escape(prefix)}[{''.join(map(re.escape, lasts))}]" for prefix, lasts in by_prefix.items()
+    )
+    return re.compile(f'(?=({alternation}))' if overlapping else alternation)
+
+
+def _reference_thresholds(forbidden, frequency):
+    """
+    Reference frequencies kₓ restricted to the forbidden set A_prh.
+    Only these are ever compared against, so the full reference table is not copied into a dict.
+    :param forbidden: frozenset[str] — forbidden set A_prh.
+    :param frequency: dict[str, float] | list[tuple[str, float]] — reference frequencies.
+    :return: dict[str, float] — {x: kₓ for x ∈ A_prh} (0 for l-grams absent from the reference).
+    """
+
+    if not isinstance(frequency, dict):
+        frequency = {gram: freq for gram, freq in frequency if gram in forbidden}
+    return {gram: frequency.get(gram, 0) for gram in forbidden}
+
+
+def _exceeds_reference(grams, thresholds, total):
+    """
+    Decision rule of Criterion 1.2 for a single sequence, evaluated while counting.
+    Counts are non-decreasing, so the first time some forbidden l-gram x reaches
+    count / total > kₓ the final frequency exceeds kₓ as well — the rest of the text is skipped.
+    :param grams: Iterable[str] — l-grams of the sequence (e.g. the forbidden bigram hits).
+    :param thresholds: dict[str, float] — kₓ for every x ∈ A_prh (see _reference_thresholds).
+    :param total: int — number of l-grams in the sequence.
+    :return: bool — True if ∃x ∈ A_prh with fₓ > kₓ (accept H₁).
+    """
+
+    found = {}
+    found_get = found.get
+    threshold_get = thresholds.get
+    for gram in grams:
+        k = threshold_get(gram)
+        if k is not None:
+            cnt = found[gram] = found_get(gram, 0) + 1
+            if cnt / total > k:
+                return True
+    return False
+
+
+def _symbols_exceed(text, thresholds):
+    """
+    Decision rule of Criterion 1.2 for l=1: each forbidden symbol is counted with one str.count
+    (a C-level scan) instead of walking the text symbol by symbol.
+    :param text: str — analyzed sequence.
+    :param thresholds: dict[str, float] — kₓ for every forbidden symbol x ∈ A_prh.
+    :return: bool — True if ∃x ∈ A_prh with fₓ > kₓ (accept H₁).
+    """
+
+    total = len(text)
+    if not total:
+        return False
+    return any(text.count(ch) / total > k for ch, k in thresholds.items())
+
+
 def criteria_1_0(generated_texts, forbidden_symbols=None, forbidden_bigrams=None):
     """
     Criterion 1.0 — Detection of forbidden l-grams in plaintext and ciphertext sequences.
@@ -31,21 +131,16 @@ def criteria_1_0(generated_texts, forbidden_symbols=None, forbidden_bigrams=None
     """
 
     result = {}
+    pattern = _compile_pattern(_as_set(forbidden_bigrams if forbidden_bigrams is not None else forbidden_symbols))
 
     for length, texts in generated_texts.items():
         plain_count = 0
         cipher_count = 0
         for text in texts:
-            if forbidden_bigrams is not None:
-                if any(bg in text['plaintext'] for bg in forbidden_bigrams):
-                    plain_count += 1
-                if any(bg in text['ciphertext'] for bg in forbidden_bigrams):
-                    cipher_count += 1
-            else:
-                if any(ch in forbidden_symbols for ch in text['plaintext']):
-                    plain_count += 1
-                if any(ch in forbidden_symbols for ch in text['ciphertext']):
-                    cipher_count += 1
+            if pattern.search(text['plaintext']):
+                plain_count += 1
+            if pattern.search(text['ciphertext']):
+                cipher_count += 1
         result[length] = (plain_count, cipher_count)
     return result
 
@@ -79,18 +174,21 @@ def criteria_1_1(generated_texts, kp=2, forbidden_symbols=None, forbidden_bigram
     """
 
     result = {}
+    fs = _as_set(forbidden_symbols)
+    fb = _as_set(forbidden_bigrams)
+    pattern = _compile_pattern(fb, overlapping=True) if fb is not None else None
 
     for length, texts in generated_texts.items():
         plain_count = 0
         cipher_count = 0
 
         for text in texts:
-            if forbidden_bigrams is not None:
-                found_plain = {bg for bg in forbidden_bigrams if bg in text['plaintext']}
-                found_cipher = {bg for bg in forbidden_bigrams if bg in text['ciphertext']}
+            if fb is not None:
+                found_plain = set(pattern.findall(text['plaintext']))
+                found_cipher = set(pattern.findall(text['ciphertext']))
             else:
-                found_plain = {ch for ch in forbidden_symbols if ch in text['plaintext']}
-                found_cipher = {ch for ch in forbidden_symbols if ch in text['ciphertext']}
+                found_plain = {ch for ch in fs if ch in text['plaintext']}
+                found_cipher = {ch for ch in fs if ch in text['ciphertext']}
 
             if len(found_plain) >= kp:
                 plain_count += 1
@@ -135,67 +233,31 @@ def criteria_1_2(generated_texts, forbidden_symbols=None, symbols_frequency=None
     """
 
     result = {}
+    fs = _as_set(forbidden_symbols)
+    fb = _as_set(forbidden_bigrams)
 
     if forbidden_bigrams:
-        ref_freq = dict(bigrams_frequency)
+        thresholds = _reference_thresholds(fb, bigrams_frequency)
     else:
-        ref_freq = dict(symbols_frequency)
+        thresholds = _reference_thresholds(fs, symbols_frequency)
+    pattern = _compile_pattern(fb, overlapping=True) if fb else None
 
     for length, texts in generated_texts.items():
         plain_count = 0
         cipher_count = 0
 
         for text in texts:
-            if forbidden_bigrams:
-                total_plain = len(text['plaintext']) - 1
-                found_plain = {}
-                for i in range(total_plain):
-                    bg = text['plaintext'][i:i+2]
-                    if bg in forbidden_bigrams:
-                        found_plain[bg] = found_plain.get(bg, 0) + 1
-
-                for bg, cnt in found_plain.items():
-                    freq = cnt / total_plain
-                    if freq > ref_freq.get(bg, 0):
-                        plain_count += 1
-                        break
-
-                total_cipher = len(text['ciphertext']) - 1
-                found_cipher = {}
-                for i in range(total_cipher):
-                    bg = text['ciphertext'][i:i+2]
-                    if bg in forbidden_bigrams:
-                        found_cipher[bg] = found_cipher.get(bg, 0) + 1
-
-                for bg, cnt in found_cipher.items():
-                    freq = cnt / total_cipher
-                    if freq > ref_freq.get(bg, 0):
-                        cipher_count += 1
-                        break
+            if fb:
+                p_hit = _exceeds_reference(pattern.findall(text['plaintext']), thresholds, len(text['plaintext']) - 1)
+                c_hit = _exceeds_reference(pattern.findall(text['ciphertext']), thresholds, len(text['ciphertext']) - 1)
             else:
-                total_plain = len(text['plaintext'])
-                found_plain = {}
-                for ch in text['plaintext']:
-                    if ch in forbidden_symbols:
-                        found_plain[ch] = found_plain.get(ch, 0) + 1
-
-                for ch, cnt in found_plain.items():
-                    freq = cnt / total_plain
-                    if freq > ref_freq.get(ch, 0):
-                        plain_count += 1
-                        break
-
-                total_cipher = len(text['ciphertext'])
-                found_cipher = {}
-                for ch in text['ciphertext']:
-                    if ch in forbidden_symbols:
-                        found_cipher[ch] = found_cipher.get(ch, 0) + 1
-
-                for ch, cnt in found_cipher.items():
-                    freq = cnt / total_cipher
-                    if freq > ref_freq.get(ch, 0):
-                        cipher_count += 1
-                        break
+                p_hit = _symbols_exceed(text['plaintext'], thresholds)
+                c_hit = _symbols_exceed(text['ciphertext'], thresholds)
+
+            if p_hit:
+                plain_count += 1
+            if c_hit:
+                cipher_count += 1
 
         result[length] = (plain_count, cipher_count)
 
@@ -236,50 +298,43 @@ def criteria_1_3(generated_texts, forbidden_symbols=None, symbols_frequency=None
     """
 
     result = {}
+    fs = _as_set(forbidden_symbols)
+    fb = _as_set(forbidden_bigrams)
 
     if forbidden_bigrams:
-        ref_freq = dict(bigrams_frequency)
-        Kp = sum(ref_freq.get(bg, 0) for bg in forbidden_bigrams)
+        thresholds = _reference_thresholds(fb, bigrams_frequency)
+        Kp = sum(thresholds[bg] for bg in forbidden_bigrams)
     else:
-        ref_freq = dict(symbols_frequency)
-        Kp = sum(ref_freq.get(ch, 0) for ch in forbidden_symbols)
+        thresholds = _reference_thresholds(fs, symbols_frequency)
+        Kp = sum(thresholds[ch] for ch in forbidden_symbols)
+    pattern = _compile_pattern(fb, overlapping=True) if fb else None
 
     for length, texts in generated_texts.items():
         plain_count = 0
         cipher_count = 0
 
         for text in texts:
-            if forbidden_bigrams:
+            if fb:
                 total = len(text['plaintext']) - 1
-                Fp = 0
-                for i in range(total):
-                    bg = text['plaintext'][i:i+2]
-                    if bg in forbidden_bigrams:
-                        Fp += 1
-                Fp = Fp / total
+                Fp = len(pattern.findall(text['plaintext'])) / total
 
                 if Fp > Kp:
                     plain_count += 1
 
                 total = len(text['ciphertext']) - 1
-                Fc = 0
-                for i in range(total):
-                    bg = text['ciphertext'][i:i+2]
-                    if bg in forbidden_bigrams:
-                        Fc += 1
-                Fc = Fc / total
+                Fc = len(pattern.findall(text['ciphertext'])) / total
 
                 if Fc > Kp:
                     cipher_count += 1
             else:
                 total = len(text['plaintext'])
-                Fp = sum(1 for ch in text['plaintext'] if ch in forbidden_symbols) / total
+                Fp = sum(map(text['plaintext'].count, fs)) / total
 
                 if Fp > Kp:
                     plain_count += 1
 
                 total = len(text['ciphertext'])
-                Fc = sum(1 for ch in text['ciphertext'] if ch in forbidden_symbols) / total
+                Fc = sum(map(text['ciphertext'].count, fs)) / total
 
                 if Fc > Kp:
                     cipher_count += 1
@@ -313,9 +368,6 @@ def criteria_3_0(generated_texts, H, kH=0.1, bigrams=False):
 
     result = {}
 
-    count_mode = h.bigram_count_crossing if bigrams else h.symbol_count
-    entropy = h.entropy_calculate
-
     for length, texts in generated_texts.items():
         H_curr = H[length] if isinstance(H, dict) else H
         kH_curr = kH[length] if isinstance(kH, dict) else kH
@@ -327,8 +379,8 @@ def criteria_3_0(generated_texts, H, kH=0.1, bigrams=False):
             p = text['plaintext']
             c = text['ciphertext']
 
-            entropy_plain = entropy(count_mode(p))
-            entropy_cipher = entropy(count_mode(c))
+            entropy_plain = h.reference_text_entropy(p, bigrams)
+            entropy_cipher = h.text_entropy(c, bigrams)
 
             if abs(entropy_plain - H_curr) > kH_curr:
                 plain_count += 1
@@ -388,20 +440,13 @@ def criteria_5_1(generated_texts, j, kempt, symbols_frequency=None, bigrams_freq
             c = text['ciphertext']
 
             if bigrams_frequency:
-                present_p = set()
-                for i in range(len(p) - 1):
-                    bg = p[i:i+2]
-                    if bg in top_set:
-                        present_p.add(bg)
-
-                present_c = set()
-                for i in range(len(c) - 1):
-                    bg = c[i:i+2]
-                    if bg in top_set:
-                        present_c.add(bg)
+                # Crossing bigrams are built by a C-level map over (text, text shifted by one)
+                # and intersected with B_frq in C, instead of slicing text[i:i+2] per position.
+                present_p = top_set.intersection(map(operator.add, p, p[1:]))
+                present_c = top_set.intersection(map(operator.add, c, c[1:]))
             else:
-                present_p = {ch for ch in p if ch in top_set}
-                present_c = {ch for ch in c if ch in top_set}
+                present_p = {ch for ch in top_set if ch in p}
+                present_c = {ch for ch in top_set if ch in c}
 
             f_empty_p = j - len(present_p)
             f_empty_c = j - len(present_c)
@@ -416,7 +461,7 @@ def criteria_5_1(generated_texts, j, kempt, symbols_frequency=None, bigrams_freq
     return result
 
 
-def criteria_structural(generated_texts, compressor="lzma", kC=0.0, baseline_random=None):
+def criteria_structural(generated_texts, compressor="lzma", kC=0.0, baseline_random=None, level=None):
     """
     Criterion (Structural) — Compression-based test for detecting random/abnormal text.
 
@@ -441,26 +486,16 @@ def criteria_structural(generated_texts, compressor="lzma", kC=0.0, baseline_ran
     :param baseline_random: dict[int, float] | None
         Optional per-length baselines for random text, {L: R_L}. If omitted, kC is treated
         as the absolute cutoff.
+    :param level: int | None, optional (default=None)
+        Compression level (lzma preset 0-9, deflate/bzip2 level 1-9); None keeps the backend
+        defaults. Fast levels (e.g. lzma preset 0, deflate level 1) are several times cheaper;
+        baseline_random must then be computed with the same compressor and level.
 
     :return: dict[int, tuple[int, int]]
         Mapping {L: (plain_H1_count, cipher_H1_count)} — numbers of plaintexts and ciphertexts
         classified as H₁ under the rule above.
     """
 
-    def _compress_ratio(s: str) -> float:
-        data = s.encode("utf-8", errors="ignore")
-        if not data:
-            return 1.0
-        if compressor == "lzma":
-            comp = lzma.compress(data)
-        elif compressor == "deflate":
-            comp = zlib.compress(data, level=9)
-        elif compressor == "bzip2":
-            comp = bz2.compress(data, compresslevel=9)
-        else:
-            raise ValueError(f"Unknown compressor: {compressor}")
-        return len(comp) / len(data)
-
     def _kC_for(_L):
         if isinstance(kC, dict):
             return float(kC.get(_L, 0.0))
@@ -475,8 +510,8 @@ def criteria_structural(generated_texts, compressor="lzma", kC=0.0, baseline_ran
         cipher_struct = 0
 
         for item in pairs:
-            rp = _compress_ratio(item["plaintext"])
-            rc = _compress_ratio(item["ciphertext"])
+            rp = h.reference_compression_ratio(item["plaintext"], compressor, level)
+            rc = _compress_ratio(item["ciphertext"], compressor, level)
 
             if R_L is not None:
                 if rp < R_L - kC_L:
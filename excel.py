@@ -1,81 +1,81 @@
+import itertools
+import math
+
 import pandas as pd
 
 
-def _flatten_cipher(cipher_dict):
+def _criteria_label(crit_key):
     """
-    Flatten a nested cipher metrics dictionary into a pandas DataFrame with columns
-    [L, Criteria, l, FP, FN], suitable for tabular representation and export.
+    Parse a metrics key into the (Criteria, l) labels used in the report.
 
     Supports keys like:
         - "criteria_1_3_sym", "criteria_1_3_big"
         - "criteria_structural"
         - "criteria_structural_sym" / "criteria_structural_big"
-    """
 
-    rows = []
-    for crit_key, sizes in cipher_dict.items():
-        parts = crit_key.split('_')
-        if not parts or parts[0] != "criteria":
-            continue
+    :param crit_key: str
+        Criterion key from the cipher metrics dictionary.
+    :return: tuple[str, str] | None
+        (criteria, "l=1" | "l=2"), or None for keys that are not criteria.
+    """
 
-        if len(parts) == 4 and parts[1].isdigit() and parts[2].isdigit():
-            criteria = f"{parts[1]}.{parts[2]}"
-            gram = parts[3].lower()
-            lstr = "l=1" if gram in {"sym", "symbol", "symbols"} else "l=2"
+    parts = crit_key.split('_')
+    if not parts or parts[0] != "criteria":
+        return None
 
-        elif len(parts) >= 2 and parts[1].lower() == "structural":
-            criteria = "structural"
-            if len(parts) >= 3 and parts[2].lower() in {"big", "bigram", "bigrams"}:
-                lstr = "l=2"
-            else:
-                lstr = "l=1"
+    if len(parts) == 4 and parts[1].isdigit() and parts[2].isdigit():
+        criteria = f"{parts[1]}.{parts[2]}"
+        gram = parts[3].lower()
+        lstr = "l=1" if gram in {"sym", "symbol", "symbols"} else "l=2"
 
+    elif len(parts) >= 2 and parts[1].lower() == "structural":
+        criteria = "structural"
+        if len(parts) >= 3 and parts[2].lower() in {"big", "bigram", "bigrams"}:
+            lstr = "l=2"
         else:
-            criteria = "_".join(parts[1:]) if len(parts) > 1 else crit_key
             lstr = "l=1"
 
-        for L, vals in sizes.items():
-            rows.append({
-                "L": int(L),
-                "Criteria": criteria,
-                "l": lstr,
-                "FP": vals.get("alpha"),
-                "FN": vals.get("beta"),
-            })
-
-    if not rows:
-        return pd.DataFrame(columns=["L", "Criteria", "l", "FP", "FN"])
+    else:
+        criteria = "_".join(parts[1:]) if len(parts) > 1 else crit_key
+        lstr = "l=1"
 
-    return pd.DataFrame(rows).sort_values(["L", "Criteria", "l"]).reset_index(drop=True)
+    return criteria, lstr
 
 
-def _pivot_df(df):
+def _pivot_rows(cipher_dict):
     """
-    Convert a flat DataFrame with FP/FN values into a pivoted format suitable for Excel export,
-    splitting metrics by `l=1` and `l=2`.
-
-    :param df: pandas.DataFrame
-        Input DataFrame with columns ["L", "Criteria", "l", "FP", "FN"].
-    :return: pandas.DataFrame
-        Pivoted DataFrame with columns:
-        ["L", "Criteria", "FP (l=1)", "FN (l=1)", "FP (l=2)", "FN (l=2)"].
+    Build the report table for one cipher in a single pass over its nested metrics dictionary,
+    placing FP/FN directly into the `l=1` / `l=2` slots of the (L, Criteria) row.
+
+    Matches a pivot with aggfunc="first": each slot keeps the first value that is not missing
+    (None or NaN). Infinite values are shown as '' in the sheet. Rows with no finite value
+    are dropped, like the all-NaN rows that the pivot drops.
+
+    :param cipher_dict: dict[str, dict[int, dict[str, float]]]
+        Mapping {criterion_key: {L: {'alpha': FP, 'beta': FN}}}.
+    :return: list[tuple]
+        Rows (L, Criteria, FP (l=1), FN (l=1), FP (l=2), FN (l=2)) sorted by (L, Criteria);
+        missing and infinite values are ''.
     """
 
-    fp = df.pivot_table(index=["L", "Criteria"], columns="l", values="FP", aggfunc="first")
-    fn = df.pivot_table(index=["L", "Criteria"], columns="l", values="FN", aggfunc="first")
-    for col in ["l=1", "l=2"]:
-        if col not in fp.columns:
-            fp[col] = None
-        if col not in fn.columns:
-            fn[col] = None
-    return pd.DataFrame({
-        "L": fp.index.get_level_values("L"),
-        "Criteria": fp.index.get_level_values("Criteria"),
-        "FP (l=1)": fp["l=1"].values,
-        "FN (l=1)": fn["l=1"].values,
-        "FP (l=2)": fp["l=2"].values,
-        "FN (l=2)": fn["l=2"].values,
-    })
+    cells = {}
+    for crit_key, sizes in cipher_dict.items():
+        label = _criteria_label(crit_key)
+        if label is None:
+            continue
+        criteria, lstr = label
+        offset = 0 if lstr == "l=1" else 2
+
+        for L, vals in sizes.items():
+            row = cells.setdefault((int(L), criteria), [None, None, None, None])
+            for k, metric in enumerate(("alpha", "beta")):
+                v = vals.get(metric)
+                if row[offset + k] is None and v is not None and v == v:
+                    row[offset + k] = v
+
+    return [(L, criteria, *('' if v is None or math.isinf(v) else v for v in row))
+            for (L, criteria), row in sorted(cells.items())
+            if any(v is not None and math.isfinite(v) for v in row)]
 
 
 def generate_excel(results, output_path):
@@ -84,7 +84,7 @@ def generate_excel(results, output_path):
 
     :param results: dict
         Mapping {cipher_name: cipher_block}, where each cipher_block is a nested dictionary
-        of criteria and values suitable for _flatten_cipher().
+        of criteria and values suitable for _pivot_rows().
     :param output_path: str | Path
         File path for the generated Excel file.
     :return: None
@@ -111,11 +111,9 @@ def generate_excel(results, output_path):
         fmt_cell = wb.add_format({"align": "center", "valign": "vcenter", "border": 1})
 
         for cipher_name, cipher_block in results.items():
-            df = _flatten_cipher(cipher_block)
-            if df.empty:
+            table = _pivot_rows(cipher_block)
+            if not table:
                 continue
-            table = _pivot_df(df)
-            table = table.replace([float('inf'), float('-inf')], None).fillna('')
 
             ws = wb.add_worksheet(cipher_name)
             writer.sheets[cipher_name] = ws
@@ -132,30 +130,24 @@ def generate_excel(results, output_path):
             ws.write(2, 4, "FP", fmt_head)
             ws.write(2, 5, "FN", fmt_head)
 
-            start_row = 3
-            for r, row in enumerate(table.itertuples(index=False)):
-                for c, val in enumerate(row):
-                    ws.write(start_row + r, c, val, fmt_cell)
-
             headers = ["L", "Criteria", "FP (l=1)", "FN (l=1)", "FP (l=2)", "FN (l=2)"]
             min_widths = [8, 14, 8, 8, 8, 8]
             max_width = 30
 
+            start_row = 3
             col_widths = [len(h) for h in headers]
-            for r in table.itertuples(index=False):
-                for c, val in enumerate(r):
+            for r, row in enumerate(table):
+                ws.write_row(start_row + r, 0, row, fmt_cell)
+                for c, val in enumerate(row):
                     col_widths[c] = max(col_widths[c], len(str(val)))
             for c, w in enumerate(col_widths):
                 ws.set_column(c, c, min(max(w + 2, min_widths[c]), max_width))
 
-            l_vals = table["L"].tolist()
             grp_start = start_row
-            for i in range(1, len(l_vals)):
-                if l_vals[i] != l_vals[i - 1]:
-                    if grp_start != start_row + i - 1:
-                        ws.merge_range(grp_start, 0, start_row + i - 1, 0, l_vals[i - 1], fmt_cell)
-                    grp_start = start_row + i
-            if l_vals and grp_start != start_row + len(l_vals) - 1:
-                ws.merge_range(grp_start, 0, start_row + len(l_vals) - 1, 0, l_vals[-1], fmt_cell)
+            for l_val, grp in itertools.groupby(row[0] for row in table):
+                grp_len = sum(1 for _ in grp)
+                if grp_len > 1:
+                    ws.merge_range(grp_start, 0, grp_start + grp_len - 1, 0, l_val, fmt_cell)
+                grp_start += grp_len
 
     print(f"Excel file created successfully: {output_path}")
@@ -1,9 +1,24 @@
+import functools
 import random
 from ciphers import affine as aff
 from ciphers import affine_bigram as affb
 from ciphers import vigenere as v
 from helper import _random_affine_keys
 
+# Shared Mersenne Twister for the statistical experiments (random texts, recurrence seeds,
+# Vigenere keys of test ciphertexts); nothing here needs cryptographic randomness.
+_rng = random.Random()
+
+
+def reseed_rng():
+    """
+    Reseed the module generator from OS entropy.
+    Used as the process-pool initializer in main.run_all_generations_errors: forked workers
+    inherit the parent's generator state and would otherwise draw identical texts and keys.
+    """
+
+    _rng.seed()
+
 
 def generate_random_text(_alphabet, text_len):
     """
@@ -14,7 +29,7 @@ def generate_random_text(_alphabet, text_len):
     :return: Randomly generated text with uniform character distribution
     """
 
-    return ''.join(random.choice(_alphabet) for _ in range(text_len))
+    return ''.join(_rng.choices(_alphabet, k=text_len))
 
 
 def generate_recurse_text(_alphabet, text_len):
@@ -26,14 +41,24 @@ def generate_recurse_text(_alphabet, text_len):
     :param text_len: desired length (>=2)
     """
 
-    rand = random.SystemRandom()
-    res = rand.choice(_alphabet) + rand.choice(_alphabet)
+    m = len(_alphabet)
+    s0, s1 = prev, curr = _rng.randrange(m), _rng.randrange(m)
 
+    # The recurrence runs on alphabet indices, so no _alphabet.index() search per step;
+    # characters are collected in a list and joined once instead of growing a string.
+    # The state (s_{i-1}, s_i) takes at most m^2 values, so the sequence is periodic (for
+    # m = 32 the period divides 48): once the seed pair comes back, the period found so far
+    # is repeated at C level instead of iterating up to text_len.
+    res = [_alphabet[prev], _alphabet[curr]]
+    append = res.append
     for _ in range(text_len - 2):
-        idx = (_alphabet.index(res[-1]) + _alphabet.index(res[-2])) % len(_alphabet)
-        res += _alphabet[idx]
+        prev, curr = curr, (prev + curr) % m
+        if prev == s0 and curr == s1:
+            period = ''.join(res[:-1])
+            return (period * (text_len // len(period) + 1))[:text_len]
+        append(_alphabet[curr])
 
-    return res
+    return ''.join(res)
 
 
 def generate_multiple_random_texts(_alphabet, plaintexts_by_len):
@@ -82,26 +107,26 @@ def generate_multiple_recurse_texts(_alphabet, plaintexts_by_len):
 
 def encrypt_texts_by_vigenere(texts_by_length, alphabet, vigenere_keys_len):
     """
-    Encrypt pre-generated texts with the Vigenere cipher for multiple key lengths,
-    returning an easy-to-index nested mapping: result[length][key_len] -> list[...].
+    Encrypt pre-generated texts with the Vigenere cipher, each with a fresh random key of
+    length vigenere_keys_len, returning an easy-to-index mapping: result[length] -> list[...].
 
     :param texts_by_length: dict[int, list[str]]
         Mapping {text_length: [plaintext1, plaintext2, ...]} produced by generate_multiple_texts.
     :param alphabet: list
         Alphabet used by the Vigenere cipher.
-    :param vigenere_keys_len: Iterable[int] | None
-        Key lengths to use.
-    :return: dict[int, dict[int, list]]
-        result[length][key_len] -> list of ciphertexts (or dicts if include_meta=True).
+    :param vigenere_keys_len: int
+        Key length to use (callers loop over key lengths, see main.run_all_generations_errors).
+    :return: dict[int, list[dict[str, str]]]
+        Mapping {text_length: [{"plaintext": ..., "ciphertext": ...}, ...]}.
     """
 
+    shifts = range(len(alphabet))
     result = {}
     for length, texts in texts_by_length.items():
-        result[length] = {}
         bucket = []
         for plaintext in texts:
-            key = generate_random_text(alphabet, vigenere_keys_len)
-            ciphertext = v.encrypt(alphabet, plaintext, key)
+            key_indices = _rng.choices(shifts, k=vigenere_keys_len)
+            ciphertext = v.encrypt_shifts(alphabet, plaintext, key_indices)
             bucket.append({
                 "plaintext": plaintext,
                 "ciphertext": ciphertext
@@ -177,9 +202,11 @@ def encrypt_texts_by_affine_bigram(texts_by_length, alphabet, crossing=True, pad
     return result
 
 
+@functools.lru_cache(maxsize=64)
 def generate_of_non_coherent_text(len_text):
     """
     Generate a non-coherent text consisting of a single repeated character ('а').
+    The result is an immutable str, so it is cached per length and shared between callers.
 
     :param len_text: int
         Desired length of the generated text.
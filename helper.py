@@ -1,8 +1,18 @@
 import bz2
+import functools
+import itertools
 import lzma
 import math
+import operator
 import random
+import re
 import zlib
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+
+# Number of characters text_processing reads from the file at a time.
+_TEXT_CHUNK_SIZE = 1 << 18
 
 
 def text_processing(filename, _alphabet):
@@ -17,43 +27,63 @@ def text_processing(filename, _alphabet):
     :param _alphabet: String containing the allowed characters (alphabet).
     :return: A cleaned and normalized string ready for encryption.
     """
+    # The file is read in chunks, so only one chunk plus the cleaned output are held in memory.
+    # Each chunk is cleaned with one str.translate pass: 'ґ' -> 'г', every other character that
+    # is not in the alphabet is deleted (the table grows as new characters appear); split/join
+    # then drops any whitespace that is left.
+    table = {ord('ґ'): 'г'}
+    seen = {'ґ'}
+    cleaned = []
     with open(filename, 'r', encoding='UTF-8') as text_file:
-        text = text_file.read().lower()
-
-    words = text.split()
-
-    for index, word in enumerate(words):
-        for symbol in word:
-            if symbol == 'ґ':
-                word = word.replace(symbol, 'г')
-            elif symbol not in _alphabet:
-                word = word.replace(symbol, '')
-
-        words[index] = word
+        for chunk in iter(lambda: text_file.read(_TEXT_CHUNK_SIZE), ''):
+            chunk = chunk.lower()
+            new_symbols = set(chunk) - seen
+            if new_symbols:
+                seen |= new_symbols
+                table.update({ord(symbol): None for symbol in new_symbols if symbol not in _alphabet})
+            cleaned.append(''.join(chunk.translate(table).split()))
 
-    return ''.join(words)
+    return ''.join(cleaned)
 
 
 def symbol_count(_text):
     """
     Counts the frequency of each character in the given text.
-    - Iterates over all characters in the text.
-    - Counts how many times each character appears.
+    - Counts how many times each character appears (collections.Counter, counted in C).
     - Returns the result as a sorted list of (character, count) pairs,
-      ordered by frequency in descending order.
+      ordered by frequency in descending order (ties keep first-occurrence order).
     :param _text: String containing the text to analyze.
     :return: List of tuples (symbol, count) sorted by count in descending order.
     """
-    _symbol_count = {}
 
-    for symbol in _text:
-        if symbol in _symbol_count:
-            _symbol_count[symbol] += 1
-        else:
-            _symbol_count[symbol] = 1
+    return Counter(_text).most_common()
+
+
+def _symbol_counts(_text):
+    """
+    Counts every distinct character of the text, without keeping the characters themselves.
+    When the text has a single-byte encoding (BYTE_ENCODING), each of its at most 256 distinct
+    bytes is counted with one bytes.count scan, which is about twice as fast on long texts as
+    collections.Counter (one dict update per character); other texts fall back to Counter.
+    :param _text: String containing the text to analyze.
+    :return: Iterable of counts, in arbitrary order.
+    """
+    try:
+        data = _text.encode(BYTE_ENCODING)
+    except UnicodeEncodeError:
+        return Counter(_text).values()
+
+    return map(data.count, set(data))
 
-    sorted_symbol_count = sorted(_symbol_count.items(), key=lambda items: items[1], reverse=True)
-    return sorted_symbol_count
+
+def _relative_frequencies(counts):
+    """
+    Shared body of symbol_frequency / bigram_frequency.
+    :param counts: List of (item, count) tuples.
+    :return: List of (item, frequency) tuples, frequency rounded to three decimal places.
+    """
+    total = sum(map(operator.itemgetter(1), counts)) or 1
+    return [(item, round(count / total, 3)) for item, count in counts]
 
 
 def symbol_frequency(_symbol_counts):
@@ -70,9 +100,7 @@ def symbol_frequency(_symbol_counts):
     :return: List of tuples (symbol, frequency) where frequency is a float in [0,1],
              rounded to three decimal places.
     """
-    total = sum(count for _, count in _symbol_counts) if _symbol_counts else 1
-    freq = [(sym, round(count / total, 3)) for sym, count in _symbol_counts]
-    return freq
+    return _relative_frequencies(_symbol_counts)
 
 
 def bigram_count_crossing(_text):
@@ -86,20 +114,7 @@ def bigram_count_crossing(_text):
     :return: List of tuples (bigram, count) sorted by count in descending order.
     """
 
-    bigrams_count = {}
-    step = 1
-
-    for symbol in _text:
-        bigram = symbol + _text[step]
-        if bigram in bigrams_count:
-            bigrams_count[bigram] += 1
-        else:
-            bigrams_count[bigram] = 1
-        if step != len(_text) - 1:
-            step += 1
-
-    sorted_bigrams_count = sorted(bigrams_count.items(), key=lambda key: key[1], reverse=True)
-    return sorted_bigrams_count
+    return Counter(map(operator.add, _text, _text[1:])).most_common()
 
 
 def bigram_count_not_crossing(_text):
@@ -114,24 +129,8 @@ def bigram_count_not_crossing(_text):
     :return: List of tuples (bigram, count) sorted by count in descending order.
     """
 
-    bigrams_count = {}
-    step = 1
-
-    if len(_text) % 2 == 0:
-        end = None
-    else:
-        end = -1
-
-    for symbol in _text[:end:2]:
-        bigram = symbol + _text[step]
-        if bigram in bigrams_count:
-            bigrams_count[bigram] += 1
-        else:
-            bigrams_count[bigram] = 1
-        step += 2
-
-    sorted_bigrams_count = sorted(bigrams_count.items(), key=lambda key: key[1], reverse=True)
-    return sorted_bigrams_count
+    # map stops at the shorter slice, so the trailing character of an odd-length text is dropped.
+    return Counter(map(operator.add, _text[0::2], _text[1::2])).most_common()
 
 
 def bigram_frequency(_bigram_counts):
@@ -148,9 +147,7 @@ def bigram_frequency(_bigram_counts):
     :return: List of tuples (bigram, frequency) where frequency is a float in [0,1],
              rounded to three decimal places.
     """
-    total = sum(count for _, count in _bigram_counts) if _bigram_counts else 1
-    freq = [(bg, round(count / total, 3)) for bg, count in _bigram_counts]
-    return freq
+    return _relative_frequencies(_bigram_counts)
 
 
 def create_matrix(symbols, bigram):
@@ -170,26 +167,36 @@ def create_matrix(symbols, bigram):
              matrix[0][j] and matrix[i][0] contain quoted single-character headers.
     """
 
-    dict_of_bigram = {key: value for key, value in bigram}
-    symbols = sorted(symbols)
+    dict_of_bigram = dict(bigram)
+    letters = [symbol[0] for symbol in sorted(symbols)]
+    headers = [f"'{letter}'" for letter in letters]
 
-    n = len(symbols) + 1
-    matrix = [[0 for _ in range(n)] for _ in range(n)]
-    matrix[0][0] = ''
-    for i in range(1, n):
-        matrix[0][i] = symbols[i-1][0]
-        matrix[i][0] = symbols[i-1][0]
+    # Each row is built in one pass: a single dict.get per cell, no key formatting.
+    get = dict_of_bigram.get
+    matrix = [[''] + headers]
+    for header, first in zip(headers, letters):
+        matrix.append([header] + [get(first + second, 0) for second in letters])
 
-    for i in range(1, n):
-        for j in range(1, n):
-            if f"{matrix[i][0]}{matrix[0][j]}" in dict_of_bigram:
-                matrix[i][j] = dict_of_bigram[f"{matrix[i][0]}{matrix[0][j]}"]
+    return matrix
 
-    for i in range(1, n):
-        matrix[0][i] = f"'{symbols[i-1][0]}'"
-        matrix[i][0] = f"'{symbols[i-1][0]}'"
 
-    return matrix
+# log2 of every count below 2^14 (above the largest sample length, L = 10000): the entropy of a
+# sample then needs one math.log2 call, for its length, instead of one per distinct l-gram.
+_LOG2 = [0.0] + [math.log2(count) for count in range(1, 1 << 14)]
+
+
+def _entropy_from_counts(counts, total):
+    """
+    Shannon entropy from absolute counts, using -Σ(p * log2(p)) = log2(N) - Σ(c * log2(c)) / N.
+    :param counts: List of positive integer counts.
+    :param total: N, the sum of `counts`.
+    :return: Shannon's entropy value (float); 0 when there are fewer than two distinct symbols/l-grams.
+    """
+    if len(counts) < 2:
+        return 0.0
+
+    log2 = _LOG2.__getitem__ if total < len(_LOG2) else math.log2
+    return math.log2(total) - sum([count * log2(count) for count in counts]) / total
 
 
 def entropy_calculate(sequence):
@@ -208,19 +215,8 @@ def entropy_calculate(sequence):
     """
     n = len(sequence[0][0])
 
-    sequence_count = 0
-    for symbol in sequence:
-        sequence_count += symbol[1]
-
-    probability_H = []
-    for symbol in sequence:
-        freq = symbol[1]
-        probability = freq / sequence_count
-        probability_H.append(probability)
-
-    H = 0
-    for freq in probability_H:
-        H -= freq * math.log2(freq)
+    frequencies = [freq for _, freq in sequence]
+    H = _entropy_from_counts(frequencies, sum(frequencies))
 
     if n == 2:
         H = H / 2
@@ -228,6 +224,45 @@ def entropy_calculate(sequence):
     return H
 
 
+def text_entropy(_text, bigrams=False):
+    """
+    Calculates the Shannon entropy of a text directly, equal to
+    entropy_calculate(symbol_count(_text)) or entropy_calculate(bigram_count_crossing(_text)).
+
+    - No sorted (symbol, count) list is built, only the counts are sorted so the terms are
+      summed in the same order as entropy_calculate (bit-identical H).
+
+    :param _text: Text string to analyze.
+    :param bigrams: If True, entropy over crossing bigrams (divided by 2); otherwise over symbols.
+    :return: Shannon's entropy value (float); 0 for a text without symbols/bigrams.
+    """
+    if bigrams:
+        counts = Counter(map(operator.add, _text, _text[1:])).values()
+    else:
+        counts = _symbol_counts(_text)
+    counts = sorted(counts, reverse=True)
+    H = _entropy_from_counts(counts, sum(counts))
+
+    return H / 2 if bigrams else H
+
+
+# Entropies of the clean reference samples, {(text, bigrams): H}, filled by compute_kH_dynamic.
+# The same samples are the plaintexts of every cipher/generator run, so Criterion 3.0 looks them
+# up here instead of recounting them; ciphertexts are never stored.
+_reference_entropies = {}
+
+
+def reference_text_entropy(_text, bigrams=False):
+    """
+    text_entropy of a reference sample, taken from the values recorded by compute_kH_dynamic.
+    :param _text: Text string to analyze.
+    :param bigrams: If True, entropy over crossing bigrams (divided by 2); otherwise over symbols.
+    :return: Shannon's entropy value (float); computed directly for a text that is not a reference sample.
+    """
+    H = _reference_entropies.get((_text, bigrams))
+    return text_entropy(_text, bigrams) if H is None else H
+
+
 def index_of_coincidence(_text, _alphabet):
     """
     Calculates the Index of Coincidence (IC) for a given text.
@@ -243,14 +278,11 @@ def index_of_coincidence(_text, _alphabet):
     """
     len_message = len(_text)
 
-    sum = 0
-    for symbol in _alphabet:
-        frequency = _text.count(symbol)
-        sum += frequency * (frequency - 1)
+    # One str.count scan per letter: for an alphabet of ~32 letters this is about 3x faster
+    # than a single collections.Counter pass, whose per-character work runs through a dict.
+    coincidences = sum(frequency * (frequency - 1) for frequency in map(_text.count, _alphabet))
 
-    index = sum / (len_message * (len_message - 1))
-
-    return index
+    return coincidences / (len_message * (len_message - 1))
 
 
 def euclidean_algorithm_extended(a, b):
@@ -262,11 +294,80 @@ def euclidean_algorithm_extended(a, b):
     :return: (gcd, x, y)
     """
 
-    if a == 0:
-        return b, 0, 1
-    else:
-        gcd, x, y = euclidean_algorithm_extended(b % a, a)
-        return gcd, y - (b // a) * x, x
+    old_r, r = a, b
+    old_x, x = 1, 0
+    old_y, y = 0, 1
+    while r:
+        q = old_r // r
+        old_r, r = r, old_r - q * r
+        old_x, x = x, old_x - q * x
+        old_y, y = y, old_y - q * y
+    return old_r, old_x, old_y
+
+
+def ensure_in_alphabet(_text, _alphabet):
+    """
+    Checks that every character of the text belongs to the alphabet.
+    The scan is a single negated character-class search, so it runs inside the regex
+    engine instead of the interpreter.
+    :param _text: Text to check.
+    :param _alphabet: Alphabet (string or list of characters).
+    :raises ValueError: If the text contains a character that is not in _alphabet.
+    """
+
+    match = re.search(f"[^{re.escape(''.join(_alphabet))}]", _text)
+    if match:
+        raise ValueError(f"Character {match.group()!r} not in alphabet")
+
+
+# Single-byte code page covering the Ukrainian alphabet: texts over it can be substituted with
+# bytes.translate (a flat 256-entry table) instead of the per-character dict lookups of str.translate.
+BYTE_ENCODING = "cp1251"
+
+
+@functools.lru_cache(maxsize=64)
+def alphabet_bytes(letters):
+    """
+    Encodes an alphabet into BYTE_ENCODING, one byte per letter.
+    :param letters: Alphabet as a string.
+    :return: bytes of the same length as `letters`, or None if a letter has no single-byte code.
+    """
+
+    try:
+        encoded = letters.encode(BYTE_ENCODING)
+    except UnicodeEncodeError:
+        return None
+    return encoded if len(encoded) == len(letters) else None
+
+
+def encode_in_alphabet(_text, letters):
+    """
+    Validates the text against the alphabet and, when possible, encodes both into BYTE_ENCODING.
+    :param _text: Text to check.
+    :param letters: Alphabet joined into a string.
+    :return: Tuple (data, letter_bytes) — the encoded text and alphabet, or (None, None) if the
+             alphabet has no single-byte encoding (callers then fall back to str operations).
+    :raises ValueError: If the text contains a character that is not in the alphabet.
+    """
+
+    letter_bytes = alphabet_bytes(letters)
+    if letter_bytes is None:
+        ensure_in_alphabet(_text, letters)
+        return None, None
+
+    try:
+        data = _text.encode(BYTE_ENCODING)
+    except UnicodeEncodeError:
+        data = None
+    if data is None or data.translate(None, letter_bytes):
+        ensure_in_alphabet(_text, letters)
+    return data, letter_bytes
+
+
+# Sampling reference fragments is purely statistical, so it uses one Mersenne Twister;
+# affine keys are still drawn from the OS CSPRNG, created once instead of per call.
+_rng = random.Random()
+_key_rng = random.SystemRandom()
 
 
 def generate_rand_text_from_cleaned_data(ukr_data, text_len):
@@ -281,10 +382,21 @@ def generate_rand_text_from_cleaned_data(ukr_data, text_len):
     :return: Randomly selected substring of `ukr_data` with length `text_len`
     """
 
-    start = random.SystemRandom().randrange(len(ukr_data) - text_len + 1)
+    start = _rng.randrange(len(ukr_data) - text_len + 1)
     return ukr_data[start:start + text_len]
 
 
+@functools.lru_cache(maxsize=64)
+def _coprime_residues(M):
+    """
+    All valid multiplicative affine keys modulo M, computed once per modulus.
+    :param M: Modulus (m for the affine cipher, m^2 for the affine bigram cipher).
+    :return: Tuple of integers a in [1, M-1] with gcd(a, M) == 1.
+    """
+
+    return tuple(a for a in range(1, M) if math.gcd(a, M) == 1)
+
+
 def _random_affine_keys(m, bigram=False):
     """
     Generate random valid keys (a, b) for the affine cipher.
@@ -301,14 +413,10 @@ def _random_affine_keys(m, bigram=False):
     """
 
     M = m ** 2 if bigram else m
-    rnd = random.SystemRandom()
-
-    while True:
-        a = rnd.randrange(1, M)
-        if euclidean_algorithm_extended(a, M)[0] == 1:
-            break
 
-    b = rnd.randrange(0, M)
+    # Uniform over the valid keys, like the former rejection loop, but with a single draw.
+    a = _key_rng.choice(_coprime_residues(M))
+    b = _key_rng.randrange(0, M)
     return a, b
 
 
@@ -331,54 +439,54 @@ def generate_multiple_texts_by_cleaned_text(ukr_data, len_texts, count_texts):
     """
 
     results = {}
+    randrange = _rng.randrange
     for text_len, count in zip(len_texts, count_texts):
-        texts = [
-            generate_rand_text_from_cleaned_data(ukr_data, text_len)
-            for _ in range(count)
+        span = len(ukr_data) - text_len + 1
+        results[text_len] = [
+            ukr_data[start:start + text_len]
+            for start in [randrange(span) for _ in range(count)]
         ]
-        results[text_len] = texts
 
     return results
 
 
-def select_unigram_sets_from_counts(counts, forbid_mass=0.05, popular_coverage=0.80):
+def _select_sets_from_counts(counts, forbid_mass, popular_coverage, assume_sorted):
     """
-    Use precomputed symbol counts to select:
-      - forbidden symbols: least-frequent symbols whose cumulative probability <= forbid_mass
-      - popular symbols: most-frequent symbols whose cumulative probability >= popular_coverage
+    Shared selection for select_unigram_sets_from_counts / select_bigram_sets_from_counts:
+      - forbidden: least-frequent items whose cumulative probability <= forbid_mass
+      - popular: most-frequent items whose cumulative probability >= popular_coverage
 
-    :param counts: can be:
-        - list[tuple[str,int]] like the output of symbols_count(text) (may be sorted or not)
-        - dict[str,int] mapping symbol -> count
+    :param counts: list[tuple[str,int]] or dict[str,int] of item counts.
     :param forbid_mass: float in [0,1]
     :param popular_coverage: float in (0,1]
+    :param assume_sorted: bool — if True, `counts` is a list already sorted by count in
+        descending order (as returned by symbol_count / bigram_count_*) and is not re-sorted.
     :return: dict with keys:
              "forbidden": list[str], "popular": list[str]
     """
 
     if isinstance(counts, dict):
-        items = list(counts.items())
+        items_desc = sorted(counts.items(), key=lambda kv: kv[1], reverse=True)
+    elif assume_sorted:
+        items_desc = counts
     else:
-        items = list(counts)
-
-    items_desc = sorted(items, key=lambda kv: kv[1], reverse=True)
+        items_desc = sorted(counts, key=lambda kv: kv[1], reverse=True)
     total = sum(c for _, c in items_desc) or 1
 
-    items_asc = list(reversed(items_desc))
     cum = 0.0
     forbidden = []
-    for sym, cnt in items_asc:
+    for item, cnt in reversed(items_desc):
         p = cnt / total
         if cum + p <= forbid_mass + 1e-12:
-            forbidden.append(sym)
+            forbidden.append(item)
             cum += p
         else:
             break
 
     cum = 0.0
     popular = []
-    for sym, cnt in items_desc:
-        popular.append(sym)
+    for item, cnt in items_desc:
+        popular.append(item)
         cum += cnt / total
         if cum >= popular_coverage - 1e-12:
             break
@@ -388,7 +496,27 @@ def select_unigram_sets_from_counts(counts, forbid_mass=0.05, popular_coverage=0
     return res
 
 
-def select_bigram_sets_from_counts(counts, forbid_mass=0.0025, popular_coverage=0.80):
+def select_unigram_sets_from_counts(counts, forbid_mass=0.05, popular_coverage=0.80, assume_sorted=False):
+    """
+    Use precomputed symbol counts to select:
+      - forbidden symbols: least-frequent symbols whose cumulative probability <= forbid_mass
+      - popular symbols: most-frequent symbols whose cumulative probability >= popular_coverage
+
+    :param counts: can be:
+        - list[tuple[str,int]] like the output of symbols_count(text) (may be sorted or not)
+        - dict[str,int] mapping symbol -> count
+    :param forbid_mass: float in [0,1]
+    :param popular_coverage: float in (0,1]
+    :param assume_sorted: bool — set to True when `counts` is the (descending) output of
+        symbol_count, to skip re-sorting it.
+    :return: dict with keys:
+             "forbidden": list[str], "popular": list[str]
+    """
+
+    return _select_sets_from_counts(counts, forbid_mass, popular_coverage, assume_sorted)
+
+
+def select_bigram_sets_from_counts(counts, forbid_mass=0.0025, popular_coverage=0.80, assume_sorted=False):
     """
     Use precomputed bigram counts to select:
       - forbidden bigrams: least-frequent bigrams whose cumulative probability <= forbid_mass
@@ -399,39 +527,13 @@ def select_bigram_sets_from_counts(counts, forbid_mass=0.0025, popular_coverage=
         - dict[str,int] bigram -> count
     :param forbid_mass: float у [0,1]
     :param popular_coverage: float у (0,1]
+    :param assume_sorted: bool — set to True when `counts` is the (descending) output of
+        bigram_count_*, to skip re-sorting it.
     :return: dict with keys:
              "forbidden": list[str], "popular": list[str]
     """
-    if isinstance(counts, dict):
-        items = list(counts.items())
-    else:
-        items = list(counts)
-
-    items_desc = sorted(items, key=lambda kv: kv[1], reverse=True)
-    total = sum(c for _, c in items_desc) or 1
-
-    items_asc = list(reversed(items_desc))
-    cum = 0.0
-    forbidden = []
-    for bg, cnt in items_asc:
-        p = cnt / total
-        if cum + p <= forbid_mass + 1e-12:
-            forbidden.append(bg)
-            cum += p
-        else:
-            break
-
-    cum = 0.0
-    popular = []
-    for bg, cnt in items_desc:
-        popular.append(bg)
-        cum += cnt / total
-        if cum >= popular_coverage - 1e-12:
-            break
-
-    res = {"forbidden": forbidden, "popular": popular}
 
-    return res
+    return _select_sets_from_counts(counts, forbid_mass, popular_coverage, assume_sorted)
 
 
 def result_output(result, per_line=8):
@@ -456,13 +558,14 @@ def result_output_matrix(matrix, writefile):
     :return: None
     """
 
-    matrix_filewrite = open(writefile, 'w', encoding='UTF-8')
-    for row in matrix:
-        result_row = '|'.join([str(item).rjust(6) for item in row])
-        matrix_filewrite.write(result_row + '\n')
+    # The whole table is formatted first and written in a single call, with the file closed
+    # by the context manager even if formatting fails.
+    lines = ['|'.join([str(item).rjust(6) for item in row]) + '\n' for row in matrix]
+    with open(writefile, 'w', encoding='UTF-8') as matrix_filewrite:
+        matrix_filewrite.write(''.join(lines))
 
 
-def compute_kH_dynamic(clean_texts_by_L, bigrams=False, alpha=0.05):
+def compute_kH_dynamic(clean_texts_by_L, bigrams=False, alpha=0.05, workers=None):
     """
     Compute dynamic entropy thresholds (H and kH) for Criterion 3.0 based on clean reference texts.
 
@@ -485,6 +588,10 @@ def compute_kH_dynamic(clean_texts_by_L, bigrams=False, alpha=0.05):
         If True, compute entropy based on bigram statistics instead of single symbols.
     :param alpha: float, optional (default=0.05)
         Significance level determining the quantile cutoff for kH (default 95% confidence).
+    :param workers: int | None, optional (default=None)
+        Number of worker processes. Samples are independent, so with workers > 1 their entropies
+        are computed in a process pool; otherwise sequentially. Either way the sample entropies are
+        recorded for reference_text_entropy, which Criterion 3.0 uses for the same texts.
     :return: tuple[dict[int, float], dict[int, float]]
         Two dictionaries:
             - result_H: {L: mean entropy Hₗ for each text length}
@@ -494,12 +601,16 @@ def compute_kH_dynamic(clean_texts_by_L, bigrams=False, alpha=0.05):
     result_H = {}
     result_kH = {}
 
-    count_mode = bigram_count_crossing if bigrams else symbol_count
+    if workers is not None and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            H_by_L = {L: list(pool.map(text_entropy, samples, itertools.repeat(bigrams), chunksize=256))
+                      for L, samples in clean_texts_by_L.items()}
+    else:
+        H_by_L = {L: list(map(text_entropy, samples, itertools.repeat(bigrams)))
+                  for L, samples in clean_texts_by_L.items()}
 
-    for L, samples in clean_texts_by_L.items():
-        H_values = []
-        for sample in samples:
-            H_values.append(entropy_calculate(count_mode(sample)))
+    for L, H_values in H_by_L.items():
+        _reference_entropies.update({(text, bigrams): H for text, H in zip(clean_texts_by_L[L], H_values)})
 
         H_mean = sum(H_values) / len(H_values)
         deltas = [abs(H - H_mean) for H in H_values]
@@ -513,13 +624,62 @@ def compute_kH_dynamic(clean_texts_by_L, bigrams=False, alpha=0.05):
     return result_H, result_kH
 
 
-def compute_structural_baseline_random(random_texts_by_L, *, compressor="lzma", alpha=0.05):
+def compression_ratio(data, compressor="lzma", level=None):
+    """
+    Compression ratio of a byte string: compressed_size / original_size.
+    Uses the incremental compressor objects and only accumulates the length of each output
+    chunk, so the compressed stream itself is never kept.
+    :param data: bytes to compress.
+    :param compressor: str, optional (default="lzma")
+        Compression backend: one of {"lzma", "deflate", "bzip2"}.
+    :param level: int | None, optional (default=None)
+        Compression level (lzma preset 0-9, deflate/bzip2 level 1-9). None keeps the defaults
+        (lzma preset 6, level 9 otherwise). Low levels are much faster and usually separate
+        random from natural text just as well; ratios are only comparable at the same level.
+    :return: float — ratio; 1.0 for empty input.
+    """
+
+    if not data:
+        return 1.0
+    if compressor == "lzma":
+        comp = lzma.LZMACompressor(preset=level)
+    elif compressor == "deflate":
+        comp = zlib.compressobj(level=9 if level is None else level)
+    elif compressor == "bzip2":
+        comp = bz2.BZ2Compressor(compresslevel=9 if level is None else level)
+    else:
+        raise ValueError(f"Unknown compressor: {compressor}")
+    return (len(comp.compress(data)) + len(comp.flush())) / len(data)
+
+
+# Compression ratios of the reference samples, {(text, compressor, level): r}, filled by
+# compute_structural_baseline_random and read by the Structural criterion for its plaintexts.
+_reference_ratios = {}
+
+
+def reference_compression_ratio(_text, compressor="lzma", level=None):
+    """
+    Compression ratio of a reference sample, taken from the values recorded by
+    compute_structural_baseline_random.
+    :param _text: Text string to analyze.
+    :param compressor: str — one of {"lzma", "deflate", "bzip2"}.
+    :param level: int | None — compression level/preset, None for the backend default.
+    :return: float — ratio; computed directly for a text that is not a reference sample.
+    """
+    r = _reference_ratios.get((_text, compressor, level))
+    if r is None:
+        r = compression_ratio(_text.encode("utf-8", errors="ignore"), compressor, level)
+    return r
+
+
+def compute_structural_baseline_random(random_texts_by_L, *, compressor="lzma", alpha=0.05, level=None):
     """
     Compute dynamic compression baselines (R_L and kC_L) for the Structural criterion
     using RANDOM reference texts.
 
     For each length L, this function computes compression ratios r_i for random samples,
-    sets R_L = mean(r_i), and kC_L = quantile(|r_i − R_L|, 1 − α).
+    sets R_L = mean(r_i), and kC_L = quantile(|r_i − R_L|, 1 − α). The ratios are recorded
+    for reference_compression_ratio.
 
     :param random_texts_by_L: dict[int, list[str]]
         Mapping {L: [random_sample1, random_sample2, ...]} generated over the same alphabet.
@@ -527,25 +687,14 @@ def compute_structural_baseline_random(random_texts_by_L, *, compressor="lzma",
         Compression backend: one of {"lzma", "deflate", "bzip2"}.
     :param alpha: float, optional (default=0.05)
         Significance level for the deviation quantile (95% band by default).
+    :param level: int | None, optional (default=None)
+        Compression level (see compression_ratio); must match the level used by the criterion.
     :return: tuple[dict[int, float], dict[int, float]]
         Two mappings:
             - R:    {L: baseline compression ratio for random texts of length L}
             - kC_L: {L: (1 - alpha)-quantile of |r_i - R[L]|}
     """
 
-    def _compress_ratio_bytes(_b):
-        if not _b:
-            return 1.0
-        if compressor == "lzma":
-            comp = lzma.compress(_b)
-        elif compressor == "deflate":
-            comp = zlib.compress(_b, level=9)
-        elif compressor == "bzip2":
-            comp = bz2.compress(_b, compresslevel=9)
-        else:
-            raise ValueError(f"Unknown compressor: {compressor}")
-        return len(comp) / len(_b)
-
     R = {}
     kC_L = {}
 
@@ -553,7 +702,8 @@ def compute_structural_baseline_random(random_texts_by_L, *, compressor="lzma",
         ratios = []
         for s in samples:
             b = s.encode("utf-8", errors="ignore")
-            ratios.append(_compress_ratio_bytes(b))
+            r = _reference_ratios[(s, compressor, level)] = compression_ratio(b, compressor, level)
+            ratios.append(r)
 
         if not ratios:
             R[L], kC_L[L] = 1.0, 0.0
@@ -1,3 +1,6 @@
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
 import criteria as c
 import gen_text as gt
 import helper as h
@@ -120,9 +123,25 @@ def _compute_errors_for_encrypted(encrypted, *, forbidden_symbols, forbidden_big
     return calc_error_rates_for_all_criteria(all_criteria, len_texts, count_texts)
 
 
+def _errors_for_generator(make_encrypted, criteria_params):
+    """
+    Produce one generator's plaintext–ciphertext pairs and compute their error rates.
+    Defined at module level (not as a closure) so that it can be sent to worker processes.
+
+    :param make_encrypted: Callable[[], dict[int, list[dict[str, str]]]]
+        Picklable callable returning {L: [{"plaintext": ..., "ciphertext": ...}, ...]}.
+    :param criteria_params: dict
+        Keyword arguments passed on to `_compute_errors_for_encrypted`.
+    :return: dict[str, dict[int, dict[str, float]]]
+        Mapping {criterion_name: {L: {'alpha': α, 'beta': β}}}.
+    """
+
+    return _compute_errors_for_encrypted(make_encrypted(), **criteria_params)
+
+
 def run_all_generations_errors(*, generated_random_texts, alphabet, len_texts, count_texts, forbidden_symbols,
                                forbidden_bigrams, symbols_frequency, bigrams_frequency, H_dynamic_sym, kH_dynamic_sym,
-                               H_dynamic_big, kH_dynamic_big, R, kC_L, vigenere_keys=(1, 5, 10)):
+                               H_dynamic_big, kH_dynamic_big, R, kC_L, vigenere_keys=(1, 5, 10), workers=None):
     """
     Run all text-generation/encryption pipelines and compute error rates for each criterion.
 
@@ -158,57 +177,52 @@ def run_all_generations_errors(*, generated_random_texts, alphabet, len_texts, c
         Entropy deviation threshold k_H for bigrams per length L (for Criterion 3.0 with bigrams=True).
     :param vigenere_keys: Iterable[int], optional (default=(1, 5, 10))
         Key lengths to use for Vigenere encryption pipelines.
+    :param workers: int | None, optional (default=None)
+        Number of worker processes. The generators are independent, so with workers > 1 each one
+        is generated and evaluated in a process pool; otherwise they run sequentially, which lets
+        the per-text caches of the criteria reuse the plaintext results across generators.
+        This is the only process pool of the pipeline: encryption and the criteria inside
+        each generator always run sequentially.
 
     :return: dict[str, dict[str, dict[int, dict[str, float]]]]
         Mapping {generator_name: {criterion_name: {L: {'alpha': α, 'beta': β}}}}, where
         generator_name ∈ {"vigenere_k{K}", "affine", "affine_bigram", "random", "recursive"}.
     """
 
-    out = {}
-
-    for k in vigenere_keys:
-        enc = gt.encrypt_texts_by_vigenere(generated_random_texts, alphabet, k)
-        out[f"vigenere_k{k}"] = _compute_errors_for_encrypted(
-            enc,
-            forbidden_symbols=forbidden_symbols,
-            forbidden_bigrams=forbidden_bigrams,
-            symbols_frequency=symbols_frequency,
-            bigrams_frequency=bigrams_frequency,
-            H_dynamic_sym=H_dynamic_sym,
-            kH_dynamic_sym=kH_dynamic_sym,
-            H_dynamic_big=H_dynamic_big,
-            kH_dynamic_big=kH_dynamic_big,
-            len_texts=len_texts,
-            count_texts=count_texts,
-            R=R, kC_L=kC_L
-        )
-
-    gens = [
-        ("affine",        gt.encrypt_texts_by_affine(generated_random_texts, alphabet)),
-        ("affine_bigram", gt.encrypt_texts_by_affine_bigram(generated_random_texts, alphabet, True, alphabet[0])),
-        ("random",        gt.generate_multiple_random_texts(alphabet, generated_random_texts)),
-        ("recursive",     gt.generate_multiple_recurse_texts(alphabet, generated_random_texts)),
+    criteria_params = dict(
+        forbidden_symbols=forbidden_symbols,
+        forbidden_bigrams=forbidden_bigrams,
+        symbols_frequency=symbols_frequency,
+        bigrams_frequency=bigrams_frequency,
+        H_dynamic_sym=H_dynamic_sym,
+        kH_dynamic_sym=kH_dynamic_sym,
+        H_dynamic_big=H_dynamic_big,
+        kH_dynamic_big=kH_dynamic_big,
+        len_texts=len_texts,
+        count_texts=count_texts,
+        R=R, kC_L=kC_L
+    )
+
+    gens = [(f"vigenere_k{k}", functools.partial(gt.encrypt_texts_by_vigenere, generated_random_texts, alphabet, k))
+            for k in vigenere_keys]
+    gens += [
+        ("affine",        functools.partial(gt.encrypt_texts_by_affine, generated_random_texts, alphabet)),
+        ("affine_bigram", functools.partial(gt.encrypt_texts_by_affine_bigram, generated_random_texts, alphabet,
+                                            True, alphabet[0])),
+        ("random",        functools.partial(gt.generate_multiple_random_texts, alphabet, generated_random_texts)),
+        ("recursive",     functools.partial(gt.generate_multiple_recurse_texts, alphabet, generated_random_texts)),
     ]
-    for name, enc in gens:
-        out[name] = _compute_errors_for_encrypted(
-            enc,
-            forbidden_symbols=forbidden_symbols,
-            forbidden_bigrams=forbidden_bigrams,
-            symbols_frequency=symbols_frequency,
-            bigrams_frequency=bigrams_frequency,
-            H_dynamic_sym=H_dynamic_sym,
-            kH_dynamic_sym=kH_dynamic_sym,
-            H_dynamic_big=H_dynamic_big,
-            kH_dynamic_big=kH_dynamic_big,
-            len_texts=len_texts,
-            count_texts=count_texts,
-            R=R, kC_L=kC_L
-        )
 
-    return out
+    if workers is not None and workers > 1:
+        # Forked workers start with a copy of the generators' random state, so each one reseeds.
+        with ProcessPoolExecutor(max_workers=workers, initializer=gt.reseed_rng) as pool:
+            futures = [(name, pool.submit(_errors_for_generator, make, criteria_params)) for name, make in gens]
+            return {name: future.result() for name, future in futures}
+
+    return {name: _errors_for_generator(make, criteria_params) for name, make in gens}
 
 
-def main():
+def main(workers=None):
     """
     Main function that implements a full experimental pipeline for analyzing
     statistical and structural properties of Ukrainian text data, estimating
@@ -261,6 +275,10 @@ def main():
     In summary, this function executes the entire experimental workflow:
     from preprocessing and statistical modeling to criterion-based evaluation
     and quantitative performance assessment of text coherence detection algorithms.
+
+    :param workers: int | None, optional (default=None)
+        Number of worker processes for the criterion evaluation step (see
+        `run_all_generations_errors`); None runs all generators sequentially.
     """
 
     alphabet = [
@@ -271,10 +289,7 @@ def main():
     filenames = ['chetverte-krylo.txt', 'it.txt', 'komanda.txt', 'monte.txt', 'orden.txt',
                  'rechi.txt', 'znedoleni.txt', 'polumya.txt']
 
-    cleaned_data = ''
-
-    for filename in filenames:
-        cleaned_data += h.text_processing('data/' + filename, alphabet)
+    cleaned_data = ''.join([h.text_processing('data/' + filename, alphabet) for filename in filenames])
 
     symbols_count = h.symbol_count(cleaned_data)
     symbols_frequency = h.symbol_frequency(symbols_count)
@@ -285,13 +300,13 @@ def main():
     bigrams_frequency = h.bigram_frequency(bigrams_count_crossing_var)
     # bigrams_count_not_crossing_var = h.bigram_count_not_crossing(cleaned_data)
     #
-    unigram_sets = h.select_unigram_sets_from_counts(symbols_count)
+    unigram_sets = h.select_unigram_sets_from_counts(symbols_count, assume_sorted=True)
     forbidden_symbols = unigram_sets['forbidden']
     popular_symbols = unigram_sets['popular']
     # print(f'====================== Forbidden and popular symbols ======================\nForbidden symbols:'
     #       f' {forbidden_symbols}\nPopular symbols: {popular_symbols}')
 
-    bigram_sets = h.select_bigram_sets_from_counts(bigrams_count_crossing_var)
+    bigram_sets = h.select_bigram_sets_from_counts(bigrams_count_crossing_var, assume_sorted=True)
     forbidden_bigrams = bigram_sets['forbidden']
     popular_bigrams = bigram_sets['popular']
     # print("\n====================== Forbidden and popular bigrams ======================")
@@ -333,7 +348,8 @@ def main():
         kH_dynamic_sym=kH_dynamic_sym,
         H_dynamic_big=H_dynamic_big,
         kH_dynamic_big=kH_dynamic_big,
-        R=R, kC_L=kC_L
+        R=R, kC_L=kC_L,
+        workers=workers
     )
 
     generate_excel(all_errors, "results/cipher_results_FP_FN_test.xlsx")